@@ -1,15 +1,21 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_core.chat_history import InMemoryChatMessageHistory
-from langchain.chains.openai_functions import create_openai_fn_chain
-from typing import Dict
-from functools import lru_cache
+from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
+from langchain_core.messages import BaseMessage, HumanMessage, message_to_dict, messages_from_dict
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from collections import OrderedDict
+from typing import List, Sequence
+import json
+import msgspec
+from functools import cache
 import threading
+from .config import settings
 from .llm import get_llm
-from .services.weather_service import get_current_weather
+from .redis_client import get_redis
+from .services.weather_service import get_current_weather_many
 from .services.news_service import search_news
-from langchain.tools import tool
+from langchain_core.tools import tool
 
 
 # System prompt keeps answers crisp but helpful.
@@ -29,14 +35,17 @@ prompt = ChatPromptTemplate.from_messages([
 
 # --- Register tools for function calling ---
 @tool
-def weather_tool(location: str):
-    """Get the current weather for a location."""
-    return get_current_weather(location).dict()
+async def weather_tool(locations: List[str]):
+    """Get the current weather for one or more locations (pass all of them in one call).
+
+    Locations that cannot be resolved come back as {"location", "error"} entries.
+    """
+    return await get_current_weather_many(locations)
 
 from typing import Optional
 
 @tool
-def news_tool(
+async def news_tool(
     q: str,
     language: Optional[str] = None,
     from_date: Optional[str] = None,
@@ -44,37 +53,113 @@ def news_tool(
     limit: int = 5
 ):
     """Search news articles by query and optional filters."""
-    return search_news(q, language, from_date, to_date, limit)
+    return msgspec.to_builtins(await search_news(q, language, from_date, to_date, limit))
 
 TOOLS = [weather_tool, news_tool]
 
-# Very simple in-memory session store (swap for Redis/DB in prod)
-_session_store: Dict[str, InMemoryChatMessageHistory] = {}
-_session_store_lock = threading.Lock()
+# Very simple in-memory session store, used when `redis_url` is not set.
+# Bounded LRU of sessions; each history keeps only the most recent messages
+# so memory stays flat and prompt size does not grow with conversation length.
+MAX_SESSIONS = 10_000
+MAX_HISTORY_MESSAGES = 20
+_session_store: "OrderedDict[str, InMemoryChatMessageHistory]" = OrderedDict()
+# Lookups are lock-free (single OrderedDict ops are atomic under the GIL);
+# only creation takes a lock, sharded by session id so unrelated sessions
+# never contend.
+_SESSION_LOCK_SHARDS = 32
+_session_locks = [threading.Lock() for _ in range(_SESSION_LOCK_SHARDS)]
+
+SESSION_TTL_SECONDS = 3600
+
+class RedisSessionHistory(BaseChatMessageHistory):
+    """Chat history kept in a Redis list so every worker sees the same session.
+
+    Uses the shared client from `get_redis()` rather than a client per
+    session, trims to `MAX_HISTORY_MESSAGES` on write and refreshes a TTL so
+    idle sessions expire on their own.
+    """
+
+    def __init__(self, session_id: str, ttl: int = SESSION_TTL_SECONDS):
+        self.key = f"chat_history:{session_id}"
+        self.ttl = ttl
+
+    @property
+    def messages(self) -> List[BaseMessage]:  # type: ignore[override]
+        items = get_redis().lrange(self.key, 0, -1)
+        return messages_from_dict([json.loads(item) for item in items])
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        if not messages:
+            return
+        pipe = get_redis().pipeline()
+        pipe.rpush(self.key, *[json.dumps(message_to_dict(m)) for m in messages])
+        pipe.ltrim(self.key, -MAX_HISTORY_MESSAGES, -1)
+        pipe.expire(self.key, self.ttl)
+        pipe.execute()
+
+    def clear(self) -> None:
+        get_redis().delete(self.key)
 
-def get_session_history(session_id: str) -> InMemoryChatMessageHistory:
-    with _session_store_lock:
-        if session_id not in _session_store:
-            _session_store[session_id] = InMemoryChatMessageHistory()
-        return _session_store[session_id]
+def get_session_history(session_id: str) -> BaseChatMessageHistory:
+    if settings.redis_url:
+        return RedisSessionHistory(session_id)
+    history = _session_store.get(session_id)
+    if history is None:
+        with _session_locks[hash(session_id) % _SESSION_LOCK_SHARDS]:
+            history = _session_store.get(session_id)
+            if history is None:
+                history = InMemoryChatMessageHistory()
+                _session_store[session_id] = history
+                if len(_session_store) > MAX_SESSIONS:
+                    _session_store.popitem(last=False)
+    else:
+        try:
+            _session_store.move_to_end(session_id)
+        except KeyError:
+            # Evicted concurrently; the history is still valid for this turn.
+            pass
+    if len(history.messages) > MAX_HISTORY_MESSAGES:
+        del history.messages[:-MAX_HISTORY_MESSAGES]
+    return history
 
 # --- Chain with function calling ---
-@lru_cache()
+# Upper bound on model -> tools round-trips per user turn.
+MAX_AGENT_STEPS = 3
+
+@cache
 def get_core_chain():
-    """Build and cache the core runnable chain with function calling for Azure."""
-    from langchain.agents import initialize_agent, AgentType
+    """Build and cache the core runnable chain for Azure.
+
+    With `enable_function_calling` (default) this is a LangGraph ReAct agent
+    over `llm.bind_tools(TOOLS)`: tool calls are native OpenAI tool calls and
+    several calls in one turn run concurrently. Otherwise it is a plain
+    `prompt | llm | parser` chain and langgraph is never imported.
+
+    Both take `{"input", "history"}`; the agent returns `{"output": str}`.
+    """
     llm = get_llm()
-    agent = initialize_agent(
-        TOOLS,
-        llm,
-        agent=AgentType.OPENAI_FUNCTIONS,
-        verbose=False,
-        handle_parsing_errors=True,
-        max_iterations=3,
-    )
-    return agent
+    if not settings.enable_function_calling:
+        return prompt | llm | StrOutputParser()
+    from langgraph.prebuilt import create_react_agent
+    agent = create_react_agent(llm, TOOLS, prompt=SYSTEM)
 
-@lru_cache()
+    async def run_agent(inputs: dict, config: RunnableConfig) -> dict:
+        # Invoke the graph as one step: streaming it would hand per-node update
+        # chunks downstream instead of the final state. Token events still
+        # reach astream_events through the callbacks in `config`.
+        state = await agent.ainvoke(
+            {"messages": [*inputs["history"], HumanMessage(inputs["input"])]},
+            # Set here, not via with_config: RunnableWithMessageHistory passes
+            # its own recursion_limit down, which would override a bound one.
+            # Each step is a model node plus a tools node; an even limit lets
+            # the agent end with a "need more steps" reply instead of raising.
+            {**config, "recursion_limit": 2 * MAX_AGENT_STEPS},
+        )
+        return {"output": state["messages"][-1].content}
+
+    return RunnableLambda(run_agent)
+
+@cache
 def make_chat_chain():
     core_chain = get_core_chain()
     return RunnableWithMessageHistory(
@@ -85,8 +170,16 @@ def make_chat_chain():
     )
 
 class _LazyChatChain:
+    __slots__ = ("_chain",)
+
+    def __init__(self):
+        self._chain = None
+
     def __getattr__(self, name):
-        return getattr(make_chat_chain(), name)
+        # Resolve once, then forward directly without going through make_chat_chain().
+        if self._chain is None:
+            self._chain = make_chat_chain()
+        return getattr(self._chain, name)
 
 # Backwards-compatible module-level symbol.
 chat_chain = _LazyChatChain()
\ No newline at end of file
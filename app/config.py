@@ -1,5 +1,6 @@
 from typing import Optional
-from functools import lru_cache
+from functools import cache
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -12,13 +13,23 @@ class Settings(BaseSettings):
     azure_openai_api_key: Optional[str] = None
     azure_openai_api_version: Optional[str] = None
     azure_openai_deployment: Optional[str] = None
+    # Deployment quota; when set, LLM calls are throttled to stay under it.
+    azure_openai_rpm: Optional[int] = None
+    azure_openai_tpm: Optional[int] = None
     open_meteo_geocode_url: Optional[str] = "https://geocoding-api.open-meteo.com/v1/search"
     open_meteo_forecast_url: Optional[str] = "https://api.open-meteo.com/v1/forecast"
     newsdata_base: Optional[str] = "https://newsdata.io/api/1"
     newsdata_api_key: Optional[str] = None
-    model_config = SettingsConfigDict(env_file=".env", env_prefix="", extra="ignore")
+    # Use the tool-calling agent; set false for a plain chat chain.
+    enable_function_calling: bool = True
+    # Max in-flight /chat requests per worker; beyond this the API returns 503.
+    chat_max_concurrency: int = Field(64, ge=1)
+    # When set, chat sessions are stored in Redis and shared across workers.
+    redis_url: Optional[str] = None
+    # Frozen: settings are read once at startup and never change afterwards.
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="", extra="ignore", frozen=True)
 
-@lru_cache()
+@cache
 def get_settings() -> Settings:
     """Return a cached Settings instance. BaseSettings will read from the
     environment and the `.env` file specified in `model_config`.
@@ -27,8 +38,16 @@ def get_settings() -> Settings:
     return Settings()
 
 class _LazySettingsProxy:
+    __slots__ = ("_settings",)
+
+    def __init__(self):
+        self._settings: Optional[Settings] = None
+
     def __getattr__(self, name):
-        return getattr(get_settings(), name)
+        # Resolve once, then forward directly without going through get_settings().
+        if self._settings is None:
+            self._settings = get_settings()
+        return getattr(self._settings, name)
 
     def __repr__(self):
         return repr(get_settings())
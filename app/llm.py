@@ -1,7 +1,48 @@
+from functools import cache
+from typing import Any, List, Optional
+import tiktoken
+from aiolimiter import AsyncLimiter
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import BaseMessage
 from langchain_openai import AzureChatOpenAI
 from .config import settings
 
+class _AzureQuotaLimiter(AsyncCallbackHandler):
+    """Wait for request/token budget before each chat completion is sent.
+
+    Proactively smooths bursts to the deployment's RPM/TPM quota instead of
+    letting them hit 429s and fall back to retries.
+    """
+
+    def __init__(self, rpm: Optional[int], tpm: Optional[int]):
+        self._requests = AsyncLimiter(rpm, 60) if rpm else None
+        self._tokens = AsyncLimiter(tpm, 60) if tpm else None
+        # Loaded on first use: tiktoken downloads the BPE file the first time,
+        # which must not happen at startup or when only RPM is limited.
+        self._encoding: Optional[tiktoken.Encoding] = None
+
+    def _estimate_tokens(self, messages: List[List[BaseMessage]]) -> int:
+        if self._encoding is None:
+            self._encoding = tiktoken.get_encoding("cl100k_base")
+        text = "".join(str(m.content) for batch in messages for m in batch)
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    async def on_chat_model_start(self, serialized: Any, messages: List[List[BaseMessage]], **kwargs: Any) -> None:
+        if self._requests is not None:
+            await self._requests.acquire()
+        if self._tokens is not None:
+            # A single acquire may not exceed the bucket capacity.
+            await self._tokens.acquire(min(self._estimate_tokens(messages), self._tokens.max_rate))
+
+@cache
+def _get_quota_limiter() -> Optional[_AzureQuotaLimiter]:
+    # Shared by every LLM instance so the budget is per process, not per call.
+    if not (settings.azure_openai_rpm or settings.azure_openai_tpm):
+        return None
+    return _AzureQuotaLimiter(settings.azure_openai_rpm, settings.azure_openai_tpm)
+
 def get_llm() -> AzureChatOpenAI:
+    limiter = _get_quota_limiter()
     # Temperature low for reliability; adjust later per use case.
     return AzureChatOpenAI(
         azure_deployment=settings.azure_openai_deployment,
@@ -11,4 +52,5 @@ def get_llm() -> AzureChatOpenAI:
         temperature=0.2,
         timeout=60,
         max_retries=2,
+        callbacks=[limiter] if limiter else None,
     )
\ No newline at end of file
@@ -1,10 +1,15 @@
 from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-from .chain import chat_chain
+from .chain import chat_chain, make_chat_chain
 from langchain_core.messages import AIMessage
 from .config import get_settings
-from typing import Optional
+from typing import AsyncIterator, Callable, Optional
+import asyncio
+import json
+from functools import cache
+import msgspec
+from .services import news_service, weather_service
 from .services.weather_service import get_current_weather, WeatherResponse
 from .services.news_service import get_top_headlines, search_news
 
@@ -31,6 +36,39 @@ class ChatResponse(BaseModel):
     """Response wrapper containing the assistant's textual reply."""
     output: str = Field(..., description="Assistant reply text", example="I can provide information, answer questions, help with problem-solving, generate ideas, and assist with tasks like writing, planning, or learning. Let me know what you need!.")  # type: ignore[arg-type]
 
+# Backpressure for the LLM-bound chat endpoints: when this many chats are in
+# flight, new ones get a 503 right away instead of queueing behind them.
+# Created on first use so importing the app does not read settings.
+@cache
+def _chat_slots() -> asyncio.Semaphore:
+    return asyncio.Semaphore(get_settings().chat_max_concurrency)
+
+def _ensure_chat_capacity() -> None:
+    if _chat_slots().locked():
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent chat requests; please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+class _ChatStreamResponse(StreamingResponse):
+    """StreamingResponse that always frees its chat slot when it finishes.
+
+    The generator releases the slot as soon as the chain is done; this is the
+    fallback for a generator that never starts (e.g. the client disconnected
+    first), whose `finally` would otherwise never run.
+    """
+
+    def __init__(self, content, release_slot: Callable[[], None], **kwargs):
+        super().__init__(content, **kwargs)
+        self._release_slot = release_slot
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release_slot()
+
 @app.get("/healthz", tags=["health"], summary="Health check", response_description="Service health status")
 def healthz():
     """Simple liveness/readiness endpoint.
@@ -56,9 +94,12 @@ def swagger_redirect():
     summary="Send a chat message",
     response_description="Assistant reply",
 )
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest):
+    _ensure_chat_capacity()
+    # No await since the check, so this acquire never blocks.
+    await _chat_slots().acquire()
     try:
-        result = chat_chain.invoke(
+        result = await chat_chain.ainvoke(
             {"input": req.input},
             config={"configurable": {"session_id": req.session_id}}
         )
@@ -88,6 +129,56 @@ def chat(req: ChatRequest):
         return ChatResponse(output=output)
     except Exception as ex:
         raise HTTPException(status_code=500, detail=str(ex)) from ex
+    finally:
+        _chat_slots().release()
+
+@app.post(
+    "/chat/stream",
+    tags=["chat"],
+    summary="Send a chat message and stream the reply",
+    response_description="Server-Sent Events stream of reply tokens",
+    response_class=StreamingResponse,
+)
+async def chat_stream(req: ChatRequest):
+    """Stream the assistant reply as Server-Sent Events.
+
+    Each token is sent as `data: {"delta": "..."}`. The stream ends with an
+    `event: end` message, or `event: error` with `{"detail": "..."}` if the
+    chain fails part-way through. Returns 503 when the server is at its chat
+    concurrency limit.
+    """
+    _ensure_chat_capacity()
+    # No await since the check, so this acquire never blocks.
+    slots = _chat_slots()
+    await slots.acquire()
+    released = False
+
+    def release_slot() -> None:
+        nonlocal released
+        if not released:
+            released = True
+            slots.release()
+
+    async def event_generator() -> AsyncIterator[str]:
+        try:
+            async for event in chat_chain.astream_events(
+                {"input": req.input},
+                config={"configurable": {"session_id": req.session_id}},
+                version="v2",
+            ):
+                if event["event"] != "on_chat_model_stream":
+                    continue
+                delta = event["data"]["chunk"].content
+                # Tool-call chunks carry no text content; skip them.
+                if delta and isinstance(delta, str):
+                    yield f"data: {json.dumps({'delta': delta})}\n\n"
+            yield "event: end\ndata: {}\n\n"
+        except Exception as ex:
+            yield f"event: error\ndata: {json.dumps({'detail': str(ex)})}\n\n"
+        finally:
+            release_slot()
+
+    return _ChatStreamResponse(event_generator(), release_slot, media_type="text/event-stream")
 
 @app.get(
     "/weather/current",
@@ -96,7 +187,7 @@ def chat(req: ChatRequest):
     summary="Get current weather for a location",
     response_description="Current weather data for the requested location",
 )
-def weather_current(
+async def weather_current(
     location: str = Query(..., description="Free-form location name, e.g., 'Nairobi' or 'Amboseli National Park'"),
 ):
     """Return the current weather for a location.
@@ -110,7 +201,7 @@ def weather_current(
       returns an error.
     """
     try:
-        return get_current_weather(location)
+        return await get_current_weather(location)
     except Exception as ex:
         raise HTTPException(status_code=400, detail=str(ex)) from ex
     
@@ -120,7 +211,7 @@ def weather_current(
     summary="Get top news headlines",
     response_description="A list of top news headlines based on the provided filters",
 )
-def news_top(
+async def news_top(
     country: Optional[str] = Query(None, description="Country code, e.g., 'us'"),
     category: Optional[str] = Query(None, description="News category, e.g., 'technology'"),
     language: Optional[str] = Query(None, description="Language code, e.g., 'en'"),
@@ -139,7 +230,8 @@ def news_top(
     - 500: Internal server error if the news service fails.
     """
     try:
-        return {"articles": get_top_headlines(country, category, language, limit)}
+        articles = await get_top_headlines(country, category, language, limit)
+        return Response(msgspec.json.encode({"articles": articles}), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -149,7 +241,7 @@ def news_top(
     summary="Search news articles",
     response_description="A list of news articles matching the search query",
 )
-def news_search(
+async def news_search(
     q: str = Query(..., description="Search query string, e.g., 'climate change'"),
     language: Optional[str] = Query(None, description="Language code, e.g., 'en'"),
     from_date: Optional[str] = Query(None, description="Start date for the search, e.g., '2025-01-01'"),
@@ -170,14 +262,16 @@ def news_search(
     - 500: Internal server error if the news service fails.
     """
     try:
-        return {"articles": search_news(q, language, from_date, to_date, limit)}
+        articles = await search_news(q, language, from_date, to_date, limit)
+        return Response(msgspec.json.encode({"articles": articles}), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.on_event("startup")
 def validate_settings():
     """Validate required configuration at application startup and fail fast
-    with a clear error message if any required setting is missing."""
+    with a clear error message if any required setting is missing, then
+    pre-build the chat chain."""
     settings = get_settings()
     required = [
         "azure_openai_endpoint",
@@ -190,4 +284,13 @@ def validate_settings():
         raise RuntimeError(
             f"Missing required configuration values: {', '.join(missing)}. "
             "Please populate .env (see .env.example) or set environment variables."
-        )
\ No newline at end of file
+        )
+    # Build (and cache) the agent and LLM client now so the first /chat
+    # request does not pay for chain construction.
+    make_chat_chain()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    """Close the shared HTTP clients used by the weather and news services."""
+    await weather_service.aclose_client()
+    await news_service.aclose_client()
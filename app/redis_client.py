@@ -0,0 +1,25 @@
+from functools import cache
+import redis
+import redis.asyncio
+from .config import get_settings
+
+@cache
+def get_redis() -> redis.Redis:
+    """Return a process-wide Redis client for `settings.redis_url`.
+
+    The client owns a connection pool, so sharing one instance avoids opening
+    a new connection per session lookup.
+    """
+    url = get_settings().redis_url
+    if not url:
+        raise RuntimeError("redis_url is not set in settings")
+    return redis.Redis.from_url(url)
+
+
+@cache
+def get_async_redis() -> redis.asyncio.Redis:
+    """Return a process-wide asyncio Redis client for `settings.redis_url`."""
+    url = get_settings().redis_url
+    if not url:
+        raise RuntimeError("redis_url is not set in settings")
+    return redis.asyncio.Redis.from_url(url)
\ No newline at end of file
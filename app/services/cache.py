@@ -0,0 +1,36 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from cachetools import TTLCache
+
+class SingleFlightCache:
+    """TTL cache for async lookups that coalesces concurrent misses.
+
+    While a key is being fetched, other callers asking for the same key await
+    the same in-flight task instead of issuing their own request. Successful
+    results are kept for `ttl` seconds; failures are not cached.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, fetch))
+            self._inflight[key] = task
+        # Shield so one caller's cancellation does not cancel the shared fetch.
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            result = await fetch()
+            self._cache[key] = result
+            return result
+        finally:
+            self._inflight.pop(key, None)
\ No newline at end of file
@@ -1,11 +1,14 @@
 from __future__ import annotations
 import os
 from typing import List, Dict, Any, Optional
+from functools import cache
 from ..config import get_settings
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from .cache import SingleFlightCache
+import httpx
+import msgspec
+from tenacity import RetryCallState, retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 
+@cache
 def _newsdata_base() -> str:
     return get_settings().newsdata_base or "https://newsdata.io/api/1"
 
@@ -15,31 +18,73 @@ def _newsdata_api_key() -> str:
         raise RuntimeError("newsdata_api_key is not set in settings")
     return key
 
-# Session with sensible retries/backoff
-_SESSION = requests.Session()
-_RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
-_SESSION.mount("https://", HTTPAdapter(max_retries=_RETRY))
+# Shared async client: HTTP/2 + keepalive pool, retries on connection errors
+# (HTTP status retries are handled by `_make_request`)
+# (an explicit transport ignores client-level http2/limits, so set them here)
+_CLIENT = httpx.AsyncClient(
+    timeout=10.0,
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32),
+        retries=3,
+    ),
+)
 
-def _make_request(endpoint: str, params: dict) -> dict:
-    params = params.copy()
-    params["apikey"] = _newsdata_api_key()
+async def aclose_client() -> None:
+    """Close the shared HTTP client (called on application shutdown)."""
+    await _CLIENT.aclose()
+
+# Retry throttling and transient upstream errors with jittered exponential
+# backoff, so concurrent clients do not retry in lockstep.
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_MAX_RETRY_AFTER = 10.0
+_BACKOFF = wait_exponential_jitter(multiplier=0.25, max=4)
+
+def _is_retryable(exc: BaseException) -> bool:
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code in _RETRY_STATUSES
+
+def _retry_wait(retry_state: RetryCallState) -> float:
+    # Honour the provider's Retry-After (in seconds) on 429s, capped.
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429:
+        try:
+            return min(float(exc.response.headers["retry-after"]), _MAX_RETRY_AFTER)
+        except (KeyError, ValueError):
+            pass
+    return _BACKOFF(retry_state)
+
+@retry(stop=stop_after_attempt(4), wait=_retry_wait, retry=retry_if_exception(_is_retryable), reraise=True)
+async def _make_request(endpoint: str, params: dict) -> dict:
+    # The API key is fixed per process: set it once as a client default param
+    # (httpx merges it into every request) instead of copying params per call.
+    if "apikey" not in _CLIENT.params:
+        _CLIENT.params = _CLIENT.params.set("apikey", _newsdata_api_key())
     url = f"{_newsdata_base()}/{endpoint}"
-    resp = _SESSION.get(url, params=params, timeout=10)
+    resp = await _CLIENT.get(url, params=params)
     resp.raise_for_status()
-    return resp.json()
+    return msgspec.json.decode(resp.content)
 
-def _normalize_article(a: dict) -> dict:
-    return {
-        "title": a.get("title"),
-        "description": a.get("description"),
-        "link": a.get("link") or a.get("url"),
-        "source": (a.get("source") or {}).get("name") if isinstance(a.get("source"), dict) else a.get("source"),
-        "pubDate": a.get("pubDate") or a.get("pubDateISO") or a.get("published_at"),
-        "language": a.get("language"),
-    }
+class Article(msgspec.Struct):
+    """Normalized news article. A slotted struct that msgspec encodes to JSON in C."""
+    title: Optional[str]
+    description: Optional[str]
+    link: Optional[str]
+    source: Optional[str]
+    pubDate: Optional[str]
+    language: Optional[str]
 
-def get_top_headlines(country: Optional[str] = None, category: Optional[str] = None,
-                      language: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+def _normalize_article(a: dict) -> Article:
+    return Article(
+        title=a.get("title"),
+        description=a.get("description"),
+        link=a.get("link") or a.get("url"),
+        source=(a.get("source") or {}).get("name") if isinstance(a.get("source"), dict) else a.get("source"),
+        pubDate=a.get("pubDate") or a.get("pubDateISO") or a.get("published_at"),
+        language=a.get("language"),
+    )
+
+async def get_top_headlines(country: Optional[str] = None, category: Optional[str] = None,
+                            language: Optional[str] = None, limit: int = 5) -> List[Article]:
     """
     Fetch recent/top headlines. Uses the 'latest' endpoint (or 'search' fallback if needed).
     """
@@ -50,17 +95,25 @@ def get_top_headlines(country: Optional[str] = None, category: Optional[str] = N
         params["category"] = category
     if language:
         params["language"] = language
-    data = _make_request("latest", params)
+    data = await _make_request("latest", params)
     articles = data.get("results") or data.get("articles") or []
-    normalized = [_normalize_article(a) for a in articles]
-    return normalized[:limit]
+    return [_normalize_article(a) for a in articles[:limit]]
+
+# Search results go stale faster than weather; keep them briefly.
+_SEARCH_CACHE = SingleFlightCache(maxsize=1024, ttl=60)
 
-def search_news(q: str, language: Optional[str] = None,
-                from_date: Optional[str] = None, to_date: Optional[str] = None,
-                limit: int = 5) -> List[Dict[str, Any]]:
+async def search_news(q: str, language: Optional[str] = None,
+                      from_date: Optional[str] = None, to_date: Optional[str] = None,
+                      limit: int = 5) -> List[Article]:
     """
     Keyword search across news. Use ISO dates for from_date/to_date if desired (YYYY-MM-DD).
+    Identical concurrent or recent (1 minute) searches share one upstream request.
     """
+    key = ("news", q.strip(), language, from_date, to_date, limit)
+    return await _SEARCH_CACHE.get(key, lambda: _search_news(q, language, from_date, to_date, limit))
+
+async def _search_news(q: str, language: Optional[str], from_date: Optional[str],
+                       to_date: Optional[str], limit: int) -> List[Article]:
     params = {"q": q}
     if language:
         params["language"] = language
@@ -68,12 +121,11 @@ def search_news(q: str, language: Optional[str] = None,
         params["from"] = from_date
     if to_date:
         params["to"] = to_date
-    data = _make_request("news", params)
+    data = await _make_request("news", params)
     articles = data.get("results") or data.get("articles") or []
-    normalized = [_normalize_article(a) for a in articles]
-    return normalized[:limit]
+    return [_normalize_article(a) for a in articles[:limit]]
 
-def get_sources() -> List[Dict[str, Any]]:
+async def get_sources() -> List[Dict[str, Any]]:
     """Return available sources (id, name, category)."""
-    data = _make_request("sources", {})
+    data = await _make_request("sources", {})
     return data.get("sources", [])
\ No newline at end of file
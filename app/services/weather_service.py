@@ -1,14 +1,20 @@
 from __future__ import annotations
-import requests
-from functools import lru_cache
-from urllib.parse import quote_plus
-from typing import Optional, Dict, Any
+import asyncio
+import json
+import httpx
+import redis
+from typing import Optional, Dict, Any, List
+from functools import cache
 from ..config import get_settings
+from ..redis_client import get_async_redis
+from .cache import SingleFlightCache
 from pydantic import BaseModel
 
+@cache
 def _geocode_url() -> str:
     return get_settings().open_meteo_geocode_url or "https://geocoding-api.open-meteo.com/v1/search"
 
+@cache
 def _forecast_url() -> str:
     return get_settings().open_meteo_forecast_url or "https://api.open-meteo.com/v1/forecast"
 
@@ -22,17 +28,58 @@ class WeatherResponse(BaseModel):
     observed_at: str | None
     provider: str
 
+# Shared async client: HTTP/2 + keepalive pool, retries on connection errors
+# (an explicit transport ignores client-level http2/limits, so set them here)
+_CLIENT = httpx.AsyncClient(
+    timeout=10.0,
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32),
+        retries=3,
+    ),
+)
+
+async def aclose_client() -> None:
+    """Close the shared HTTP client (called on application shutdown)."""
+    await _CLIENT.aclose()
+
 # --- helpers ---
-@lru_cache(maxsize=256)
-def geocode_location(location: str) -> Dict[str, Any]:
+# Geocodes are effectively immutable: keep them for a day in-process and, when
+# Redis is configured, in Redis too so every worker (and restarts) share them.
+GEOCODE_TTL_SECONDS = 86400
+_GEOCODE_CACHE = SingleFlightCache(maxsize=8192, ttl=GEOCODE_TTL_SECONDS)
+
+async def geocode_location(location: str) -> Dict[str, Any]:
     """Geocode a free-form location string using Open-Meteo Geocoding API.
 
     Returns a dict with keys name, country, latitude, longitude.
     Raises ValueError when location cannot be resolved.
     """
-    # Build a simple URL-based query like: ?name={location}&count=1
-    geo_url = f"{_geocode_url()}?name={quote_plus(location)}&count=1"
-    resp = requests.get(geo_url, timeout=10)
+    key = location.lower().strip()
+    return await _GEOCODE_CACHE.get(key, lambda: _geocode_shared(key, location))
+
+async def _geocode_shared(key: str, location: str) -> Dict[str, Any]:
+    if not get_settings().redis_url:
+        return await _geocode(location)
+    # Redis is only a shared cache: if it is unavailable, geocode directly.
+    client = get_async_redis()
+    redis_key = f"geo:{key}"
+    try:
+        cached = await client.get(redis_key)
+    except redis.RedisError:
+        return await _geocode(location)
+    if cached is not None:
+        return json.loads(cached)
+    loc = await _geocode(location)
+    try:
+        await client.set(redis_key, json.dumps(loc), ex=GEOCODE_TTL_SECONDS)
+    except redis.RedisError:
+        pass
+    return loc
+
+async def _geocode(location: str) -> Dict[str, Any]:
+    # Query like: ?name={location}&count=1
+    resp = await _CLIENT.get(_geocode_url(), params={"name": location, "count": 1})
     resp.raise_for_status()
     geo = resp.json()
     results = geo.get("results") or []
@@ -46,35 +93,77 @@ def geocode_location(location: str) -> Dict[str, Any]:
         "longitude": r0["longitude"],
     }
 
+# Open-Meteo WMO weather interpretation codes (condensed)
+_WMO_LABELS: Dict[int, str] = {
+    0: "Clear sky",
+    1: "Mainly clear / Partly cloudy / Overcast",
+    2: "Mainly clear / Partly cloudy / Overcast",
+    3: "Mainly clear / Partly cloudy / Overcast",
+    45: "Fog", 48: "Fog",
+    51: "Drizzle", 53: "Drizzle", 55: "Drizzle",
+    56: "Freezing drizzle", 57: "Freezing drizzle",
+    61: "Rain", 63: "Rain", 65: "Rain",
+    66: "Freezing rain", 67: "Freezing rain",
+    71: "Snow", 73: "Snow", 75: "Snow",
+    77: "Snow grains",
+    80: "Rain showers", 81: "Rain showers", 82: "Rain showers",
+    85: "Snow showers", 86: "Snow showers",
+    95: "Thunderstorm",
+    96: "Thunderstorm with hail", 99: "Thunderstorm with hail",
+}
+
 def _weather_code_label(code: Optional[int]) -> Optional[str]:
     if code is None:
         return None
-    # Open-Meteo WMO weather interpretation codes (condensed)
-    if code == 0: return "Clear sky"
-    if code in (1, 2, 3): return "Mainly clear / Partly cloudy / Overcast"
-    if code in (45, 48): return "Fog"
-    if code in (51, 53, 55): return "Drizzle"
-    if code in (56, 57): return "Freezing drizzle"
-    if code in (61, 63, 65): return "Rain"
-    if code in (66, 67): return "Freezing rain"
-    if code in (71, 73, 75): return "Snow"
-    if code == 77: return "Snow grains"
-    if code in (80, 81, 82): return "Rain showers"
-    if code in (85, 86): return "Snow showers"
-    if code == 95: return "Thunderstorm"
-    if code in (96, 99): return "Thunderstorm with hail"
-    return f"Code {code}"
+    return _WMO_LABELS.get(code, f"Code {code}")
+
+# Current conditions change slowly; share lookups for a few minutes.
+_WEATHER_CACHE = SingleFlightCache(maxsize=1024, ttl=300)
 
 # --- public API ---
-def get_current_weather(location: str) -> WeatherResponse:
+async def get_current_weather(location: str) -> WeatherResponse:
     """
     Fetch current weather for a free-form `location` string using Open-Meteo
     geocoding followed by the forecast API.
 
-    Returns a `WeatherResponse` pydantic model suitable for API responses or
-    for use as a tool return value.
+    Returns a `WeatherResponse` pydantic model suitable for API responses.
+    """
+    return WeatherResponse(**await get_current_weather_raw(location))
+
+async def get_current_weather_raw(location: str) -> Dict[str, Any]:
+    """Same as `get_current_weather` but returns the plain, unvalidated dict.
+
+    Used by the chat tool, where the result goes straight back to the model.
+    Concurrent and recent (5 minute) lookups for the same location share one
+    upstream request; callers must not mutate the returned dict.
     """
-    loc = geocode_location(location)
+    key = ("wx", location.lower().strip())
+    return await _WEATHER_CACHE.get(key, lambda: _fetch_current_weather(location))
+
+async def get_current_weather_many(locations: List[str]) -> List[Dict[str, Any]]:
+    """Fetch current weather for several locations concurrently.
+
+    Each location runs its own geocode -> forecast chain, so total latency is
+    that of the slowest location rather than the sum. Returns plain dicts in
+    the same order as `locations`; a location that fails yields
+    `{"location": ..., "error": ...}` instead of failing the whole batch.
+    """
+    results = await asyncio.gather(
+        *[get_current_weather_raw(loc) for loc in locations], return_exceptions=True
+    )
+    out: List[Dict[str, Any]] = []
+    for loc, result in zip(locations, results):
+        if isinstance(result, Exception):
+            out.append({"location": loc, "error": str(result)})
+        elif isinstance(result, BaseException):
+            # Cancellation and other non-errors must still propagate.
+            raise result
+        else:
+            out.append(result)
+    return out
+
+async def _fetch_current_weather(location: str) -> Dict[str, Any]:
+    loc = await geocode_location(location)
     params = {
         "latitude": loc["latitude"],
         "longitude": loc["longitude"],
@@ -84,16 +173,18 @@ def get_current_weather(location: str) -> WeatherResponse:
         "timezone": "auto",
     }
 
-    resp = requests.get(_forecast_url(), params=params, timeout=10)
+    resp = await _CLIENT.get(_forecast_url(), params=params)
     resp.raise_for_status()
     payload = resp.json()
     current_weather = payload.get("current_weather")
 
     if not current_weather:
         raise RuntimeError("Open-Meteo did not return current_weather")
-    code = current_weather.get("weathercode")
+    return _build_weather_dict(loc, current_weather)
 
-    result = {
+def _build_weather_dict(loc: Dict[str, Any], current_weather: Dict[str, Any]) -> Dict[str, Any]:
+    code = current_weather.get("weathercode")
+    return {
         "location": ", ".join([v for v in [loc["name"], loc.get("country")] if v]),
         "temperature_c": current_weather.get("temperature"),
         "windspeed_kmh": current_weather.get("windspeed"),
@@ -102,6 +193,4 @@ def get_current_weather(location: str) -> WeatherResponse:
         "condition_label": _weather_code_label(code),
         "observed_at": current_weather.get("time"),
         "provider": "open-meteo",
-    }
-    
-    return WeatherResponse(**result)
\ No newline at end of file
+    }
\ No newline at end of file
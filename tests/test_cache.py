@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.services.cache import SingleFlightCache
+
+
+def test_concurrent_callers_share_one_fetch():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def run():
+        cache = SingleFlightCache(maxsize=8, ttl=60)
+        results = await asyncio.gather(*[cache.get("k", fetch) for _ in range(5)])
+        return results, await cache.get("k", fetch)
+
+    results, cached = asyncio.run(run())
+
+    assert results == ["value"] * 5
+    assert cached == "value"
+    assert calls == 1
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def ok():
+        return "recovered"
+
+    async def run():
+        cache = SingleFlightCache(maxsize=8, ttl=60)
+        results = await asyncio.gather(*[cache.get("k", failing) for _ in range(3)], return_exceptions=True)
+        return results, await cache.get("k", ok)
+
+    results, retried = asyncio.run(run())
+
+    assert calls == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    assert retried == "recovered"
+
+
+def test_cancelled_caller_does_not_cancel_shared_fetch():
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def run():
+        cache = SingleFlightCache(maxsize=8, ttl=60)
+        first = asyncio.create_task(cache.get("k", fetch))
+        second = asyncio.create_task(cache.get("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == "value"
+
+
+def test_entries_expire_after_ttl():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    async def run():
+        cache = SingleFlightCache(maxsize=8, ttl=0.05)
+        first = await cache.get("k", fetch)
+        again = await cache.get("k", fetch)
+        await asyncio.sleep(0.1)
+        return first, again, await cache.get("k", fetch)
+
+    assert asyncio.run(run()) == (1, 1, 2)
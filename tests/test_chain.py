@@ -0,0 +1,84 @@
+import asyncio
+import itertools
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from app import chain
+
+
+class FakeToolModel(GenericFakeChatModel):
+    """Fake chat model that accepts `bind_tools`, as the agent requires."""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+def _tool_call(i):
+    return AIMessage(content="", tool_calls=[{"name": "news_tool", "args": {"q": "ai"}, "id": f"call_{i}"}])
+
+
+@pytest.fixture
+def use_model(monkeypatch):
+    """Build `chain.chat_chain` on top of the given fake model."""
+
+    def _use(model):
+        monkeypatch.setattr(chain, "get_llm", lambda: model)
+        chain.get_core_chain.cache_clear()
+        chain.make_chat_chain.cache_clear()
+        chain.chat_chain._chain = None
+        chain._session_store.clear()
+
+    yield _use
+    chain.get_core_chain.cache_clear()
+    chain.make_chat_chain.cache_clear()
+    chain.chat_chain._chain = None
+    chain._session_store.clear()
+
+
+def test_astream_events_streams_tokens_and_records_history(use_model):
+    use_model(FakeToolModel(messages=iter([AIMessage(content="Hello there friend")])))
+
+    async def collect():
+        deltas, outputs = [], []
+        async for event in chain.chat_chain.astream_events(
+            {"input": "Hi"},
+            config={"configurable": {"session_id": "s1"}},
+            version="v2",
+        ):
+            if event["event"] == "on_chat_model_stream":
+                deltas.append(event["data"]["chunk"].content)
+            elif event["event"] == "on_chain_end" and event["name"] == "RunnableWithMessageHistory":
+                outputs.append(event["data"]["output"])
+        return deltas, outputs
+
+    deltas, outputs = asyncio.run(collect())
+
+    assert "".join(deltas) == "Hello there friend"
+    assert outputs == [{"output": "Hello there friend"}]
+    history = chain.get_session_history("s1").messages
+    assert [m.content for m in history] == ["Hi", "Hello there friend"]
+
+
+def test_agent_steps_are_capped_through_chat_chain(use_model, monkeypatch):
+    calls = itertools.count()
+
+    class LoopingModel(FakeToolModel):
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            next(calls)
+            return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def fake_search_news(*args, **kwargs):
+        return []
+
+    monkeypatch.setattr(chain, "search_news", fake_search_news)
+    use_model(LoopingModel(messages=(_tool_call(i) for i in itertools.count())))
+
+    result = asyncio.run(chain.chat_chain.ainvoke(
+        {"input": "Loop"},
+        config={"configurable": {"session_id": "s2"}},
+    ))
+
+    assert next(calls) == chain.MAX_AGENT_STEPS
+    assert isinstance(result["output"], str)
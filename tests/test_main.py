@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessageChunk
+from pydantic import ValidationError
+
+from app import main
+from app.config import Settings, get_settings
+
+
+class SlowStreamingChain:
+    """Stand-in for `chat_chain` that streams one token after a short delay."""
+
+    async def astream_events(self, inputs, config=None, version=None):
+        await asyncio.sleep(0.2)
+        yield {"event": "on_chat_model_stream", "data": {"chunk": AIMessageChunk(content="hi")}}
+
+
+@pytest.fixture
+def chat_max_concurrency(monkeypatch):
+    """Rebuild settings and the chat slots with the given concurrency limit."""
+
+    def _set(value):
+        monkeypatch.setenv("CHAT_MAX_CONCURRENCY", str(value))
+        get_settings.cache_clear()
+        main._chat_slots.cache_clear()
+
+    yield _set
+    monkeypatch.delenv("CHAT_MAX_CONCURRENCY", raising=False)
+    get_settings.cache_clear()
+    main._chat_slots.cache_clear()
+
+
+def test_chat_stream_rejects_requests_over_the_concurrency_limit(monkeypatch, chat_max_concurrency):
+    monkeypatch.setattr(main, "chat_chain", SlowStreamingChain())
+    chat_max_concurrency(1)
+
+    async def burst():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*[
+                client.post("/chat/stream", json={"input": "Hi", "session_id": f"s{i}"})
+                for i in range(4)
+            ])
+        return responses, main._chat_slots().locked()
+
+    responses, still_locked = asyncio.run(burst())
+
+    assert sorted(r.status_code for r in responses) == [200, 503, 503, 503]
+    ok = next(r for r in responses if r.status_code == 200)
+    assert 'data: {"delta": "hi"}' in ok.text
+    assert not still_locked
+
+
+@pytest.mark.parametrize("value", ["0", "-1"])
+def test_chat_max_concurrency_must_be_positive(monkeypatch, value):
+    monkeypatch.setenv("CHAT_MAX_CONCURRENCY", value)
+    with pytest.raises(ValidationError):
+        Settings()
@@ -0,0 +1,20 @@
+import asyncio
+
+from app.services import weather_service
+
+
+def test_get_current_weather_many_reports_failed_locations_individually(monkeypatch):
+    async def fake_raw(location):
+        if location == "Atlantis":
+            raise ValueError("Could not find coordinates for 'Atlantis'")
+        return {"location": location, "temperature_c": 25.0}
+
+    monkeypatch.setattr(weather_service, "get_current_weather_raw", fake_raw)
+
+    results = asyncio.run(weather_service.get_current_weather_many(["Nairobi", "Atlantis", "Mombasa"]))
+
+    assert results == [
+        {"location": "Nairobi", "temperature_c": 25.0},
+        {"location": "Atlantis", "error": "Could not find coordinates for 'Atlantis'"},
+        {"location": "Mombasa", "temperature_c": 25.0},
+    ]